@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for serving the Lebanese Basketball League API
+Run with: gunicorn lbl_scraper:app
+"""
+
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = 'gthread'
+threads = 4
+
+# Every worker runs a scraper, so several workers are only safe when they share
+# one scrape through Redis; without it a single worker serves all requests.
+if os.environ.get('REDIS_URL'):
+    workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+else:
+    workers = 1
+
+def post_worker_init(worker):
+    """Start the scraper's refresh loop inside each worker process"""
+    app_module = sys.modules[worker.wsgi.import_name]
+    app_module.start_background_refresh()
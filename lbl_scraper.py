@@ -4,20 +4,31 @@ Lebanese Basketball League Live Data Scraper - ENHANCED VERSION
 Fetches real-time data including upcoming games, detailed box scores, and statistics
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
-import requests
+import asyncio
+import aiohttp
 from bs4 import BeautifulSoup
 import re
+import hashlib
+import gzip
+import orjson
+import redis
 from datetime import datetime
 import threading
-import time
+import queue
 import os
+import time
+import logging
 
 app = Flask(__name__)
 CORS(app)
 
-# Global data cache
+logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(message)s')
+logger = logging.getLogger(__name__)
+
+# Global data cache. Refreshes replace the whole dict rather than mutating it,
+# so readers holding a reference always see one consistent snapshot.
 league_data = {
     'upcoming': [],
     'results': [],
@@ -36,58 +47,129 @@ BASE_URL = 'https://www.asia-basket.com'
 LEAGUE_URL = f'{BASE_URL}/Lebanon/basketball-League-LBL.aspx'
 SCHEDULE_URL = f'{BASE_URL}/Lebanon/Decathlon-Lebanese-Basketball-League-Schedule.aspx'
 
-def scrape_league_data():
-    """Scrapes all Lebanese Basketball League data"""
+STAT_CATEGORIES = ['PPG', 'RPG', 'APG', 'SPG', 'BPG']
+
+# Patterns are compiled once here instead of on every row of every scrape
+_DATE_RE = re.compile(r'[A-Za-z]{3}\.?\s?\d{1,2}')
+_MAIN_DATE_RE = re.compile(r'[A-Za-z]{3}\.?\d{1,2}')
+_STANDING_RE = re.compile(r'(\d+)\s+([A-Za-z\s]+?)\s+(\d+)-(\d+)')
+_SCORE_RE = re.compile(r'(\d+)\s*-\s*(\d+)')
+_NUM_RE = re.compile(r'\d+\.?\d*')
+_GAME_ID_RE = re.compile(r'/(\d{4})_(\d+)_(\d+)\.aspx')
+_PLAYER_HREF_RE = re.compile(r'/player/')
+_TEAM_NAME_RE = re.compile(r'[A-Z][a-z]+')
+_STANDINGS_TXT_RE = re.compile(r'Standings')
+_ROUND_RE = re.compile(r'Round \d+')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+REFRESH_INTERVAL = 300  # Refresh every 5 minutes
+
+# Optional Redis shared by all gunicorn workers so only one of them scrapes per interval
+REDIS_URL = os.environ.get('REDIS_URL')
+REDIS_POLL_INTERVAL = 5  # How often workers check Redis for a newer snapshot
+_REDIS_DATA_KEY = 'lbl:league_data'
+_REDIS_VERSION_KEY = 'lbl:last_updated'
+_REDIS_LOCK_KEY = 'lbl:refresh_lock'
+# Timeouts make a hung Redis raise RedisError instead of stalling the refresh thread
+_redis = redis.Redis.from_url(REDIS_URL, socket_timeout=5, socket_connect_timeout=5) if REDIS_URL else None
+
+# url -> (etag, last_modified, content) of the page behind the last successful scrape
+_conditional_cache = {}
+
+async def conditional_get(session, url):
+    """Fetch a page as (etag, last_modified, content), or None if unchanged since the last scrape"""
+    etag, last_modified, _ = _conditional_cache.get(url, ('', '', None))
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            return None
+        response.raise_for_status()
+        content = await response.read()
+    
+    return (
+        response.headers.get('ETag', ''),
+        response.headers.get('Last-Modified', ''),
+        content
+    )
+
+async def refresh_league_data():
+    """Fetches both pages concurrently and scrapes all league data"""
+    now_iso = datetime.now().isoformat()
     try:
-        print(f"[{datetime.now()}] Fetching data from multiple sources...")
+        logger.info("Fetching data from multiple sources...")
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        # Fetch main page and schedule page in parallel
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+            league_page, schedule_page = await asyncio.gather(
+                conditional_get(session, LEAGUE_URL),
+                conditional_get(session, SCHEDULE_URL)
+            )
         
-        # Fetch main page
-        response = requests.get(LEAGUE_URL, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Nothing changed upstream; keep the current snapshot so its ETags stay valid
+        if league_page is None and schedule_page is None:
+            logger.info("Data unchanged since last fetch")
+            return True
+        
+        league_page = league_page or _conditional_cache[LEAGUE_URL]
+        schedule_page = schedule_page or _conditional_cache[SCHEDULE_URL]
+        content = league_page[2]
+        schedule_content = schedule_page[2]
         
-        # Fetch schedule page for upcoming games
-        schedule_response = requests.get(SCHEDULE_URL, headers=headers, timeout=10)
-        schedule_response.raise_for_status()
-        schedule_soup = BeautifulSoup(schedule_response.content, 'html.parser')
+        # Both pages are parsed in full: round headings and stat headers can sit
+        # outside tables, so a table-only strainer would drop them
+        soup = BeautifulSoup(content, 'lxml')
+        schedule_soup = BeautifulSoup(schedule_content, 'lxml')
         
         # Scrape all data
         standings = scrape_standings(soup)
-        results = scrape_results(soup, schedule_soup)
-        upcoming = scrape_upcoming(schedule_soup)
+        results, upcoming = scrape_schedule(schedule_soup)
+        if not results:
+            results = scrape_results(soup)
         stats = scrape_stats(soup)
         
-        # Update global data
-        league_data['standings'] = standings
-        league_data['results'] = results
-        league_data['upcoming'] = upcoming
-        league_data['stats_leaders'] = stats
-        league_data['last_updated'] = datetime.now().isoformat()
+        # Swap in the new snapshot
+        publish_league_data({
+            'upcoming': upcoming,
+            'results': results,
+            'standings': standings,
+            'stats_leaders': stats,
+            'last_updated': now_iso
+        })
         
-        print(f"[{datetime.now()}] Data updated successfully!")
-        print(f"  - Standings: {len(standings)} teams")
-        print(f"  - Results: {len(results)} games")
-        print(f"  - Upcoming: {len(upcoming)} games")
+        # Only remember validators once their pages have been scraped successfully
+        _conditional_cache[LEAGUE_URL] = league_page
+        _conditional_cache[SCHEDULE_URL] = schedule_page
+        
+        logger.info(
+            "Data updated successfully! Standings: %d teams, Results: %d games, Upcoming: %d games",
+            len(standings), len(results), len(upcoming)
+        )
         
         return True
         
     except Exception as e:
-        print(f"[{datetime.now()}] Error scraping data: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error scraping data: %s", e)
         return False
 
+def scrape_league_data():
+    """Scrapes all Lebanese Basketball League data"""
+    return asyncio.run(refresh_league_data())
+
 def scrape_standings(soup):
     """Extract standings table"""
     standings = []
     
-    standings_section = soup.find('table')
+    standings_section = soup.select_one('table.standings, #standings table') or soup.find('table')
     if not standings_section:
-        standings_text = soup.find(string=re.compile(r'Standings'))
+        standings_text = soup.find(string=_STANDINGS_TXT_RE)
         if standings_text:
             parent = standings_text.find_parent()
             if parent:
@@ -100,15 +182,11 @@ def scrape_standings(soup):
             cols = row.find_all('td')
             if len(cols) >= 2:
                 team_link = cols[0].find('a') or cols[1].find('a')
-                team_name = team_link.text.strip() if team_link else cols[1].text.strip()
-                
-                record_text = cols[-1].text.strip() if len(cols) > 2 else ''
-                wins, losses = 0, 0
+                team_name = team_link.get_text(' ', strip=True) if team_link else cols[1].get_text(' ', strip=True)
                 
-                if '-' in record_text:
-                    parts = record_text.split('-')
-                    wins = int(parts[0])
-                    losses = int(parts[1])
+                record_text = cols[-1].get_text(' ', strip=True) if len(cols) > 2 else ''
+                match = _SCORE_RE.search(record_text)
+                wins, losses = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
                 
                 standings.append({
                     'rank': idx,
@@ -122,7 +200,7 @@ def scrape_standings(soup):
         lines = standings_text.split('\n')
         
         for line in lines:
-            match = re.search(r'(\d+)\s+([A-Za-z\s]+?)\s+(\d+)-(\d+)', line)
+            match = _STANDING_RE.search(line)
             if match:
                 standings.append({
                     'rank': int(match.group(1)),
@@ -138,177 +216,152 @@ def parse_game_id_from_url(url):
     if not url:
         return None
     # URL format: /boxScores/Lebanon/2026/0209_2628_2682.aspx
-    match = re.search(r'/(\d{4})_(\d+)_(\d+)\.aspx', url)
+    match = _GAME_ID_RE.search(url)
     if match:
         return f"{match.group(1)}_{match.group(2)}_{match.group(3)}"
     return None
 
-def scrape_results(soup, schedule_soup):
-    """Extract recent game results with game IDs and box score URLs"""
+def scrape_schedule(schedule_soup):
+    """Extract recent results and upcoming games from the schedule in one pass"""
     results = []
+    upcoming = []
+    seen = set()
     
-    # Try to find games from schedule page (more reliable)
-    games_tables = schedule_soup.find_all('table')
-    
-    for table in games_tables:
-        rows = table.find_all('tr')
+    for row in schedule_soup.select('table tr'):
+        first_col = row.find('td')
+        if not first_col:
+            continue
+        date_text = first_col.get_text().strip()
         
-        for row in rows:
-            cols = row.find_all('td')
+        # Match date patterns like "Feb.9:", "zij. 7, 8581"; dates start with a
+        # month name, so cheaply skip the regex on header, blank and total rows
+        date_match = len(date_text) >= 4 and date_text[0].isalpha() and _DATE_RE.match(date_text)
+        is_result_date = date_match or 'zij' in date_text or 'yRM' in date_text
+        is_upcoming_date = date_match or 'yRM' in date_text or 'biQ' in date_text
+        if not (is_result_date or is_upcoming_date):
+            continue
+        
+        cols = row.find_all('td', limit=5)
+        if len(cols) < 4:
+            continue
+        
+        try:
+            # Get team names from images
+            team1_elem = cols[1].find('img')
+            team2_elem = cols[3].find('img')
             
-            if len(cols) >= 4:
-                date_text = cols[0].text.strip()
+            if team1_elem and team2_elem:
+                home_team = team1_elem.get('alt', '').strip()
+                away_team = team2_elem.get('alt', '').strip()
+                
+                # Clean up date
+                clean_date = date_text.replace(':', '').replace('.', '').strip()
                 
-                # Match date patterns like "Feb.9:", "zij. 7, 8581"
-                if re.match(r'[A-Za-z]{3}\.?\s?\d{1,2}', date_text) or 'zij' in date_text or 'yRM' in date_text:
-                    try:
-                        # Get team names
-                        team1_elem = cols[1].find('img')
-                        team2_elem = cols[3].find('img') if len(cols) > 3 else None
+                # A score link means the game is completed
+                score_link = cols[2].find('a')
+                
+                if is_result_date and score_link:
+                    score_text = score_link.get_text(' ', strip=True)
+                    box_score_url = score_link.get('href', '')
+                    
+                    # Parse score
+                    match = _SCORE_RE.search(score_text)
+                    if match:
+                        home_score = int(match.group(1))
+                        away_score = int(match.group(2))
                         
-                        if team1_elem and team2_elem:
-                            home_team = team1_elem.get('alt', '').strip()
-                            away_team = team2_elem.get('alt', '').strip()
-                            
-                            # Get score link
-                            score_link = cols[2].find('a') if len(cols) > 2 else None
-                            
-                            if score_link:
-                                score_text = score_link.text.strip()
-                                box_score_url = score_link.get('href', '')
-                                
-                                # Parse score
-                                if '-' in score_text:
-                                    scores = score_text.strip('[]').split('-')
-                                    home_score = int(scores[0])
-                                    away_score = int(scores[1])
-                                    
-                                    # Generate game ID
-                                    game_id = parse_game_id_from_url(box_score_url)
-                                    
-                                    # Clean up date
-                                    clean_date = date_text.replace(':', '').replace('.', '').strip()
-                                    
-                                    results.append({
-                                        'date': clean_date,
-                                        'homeTeam': home_team,
-                                        'homeScore': home_score,
-                                        'awayTeam': away_team,
-                                        'awayScore': away_score,
-                                        'gameId': game_id,
-                                        'boxScoreUrl': f"{BASE_URL}{box_score_url}" if box_score_url else None
-                                    })
-                    except Exception as e:
-                        continue
-    
-    # Fallback to main page
-    if not results:
-        games_tables = soup.find_all('table')
-        
-        for table in games_tables:
-            rows = table.find_all('tr')
-            
-            for row in rows:
-                cols = row.find_all('td')
+                        # Generate game ID
+                        game_id = parse_game_id_from_url(box_score_url)
+                        
+                        results.append({
+                            'date': clean_date,
+                            'homeTeam': home_team,
+                            'homeScore': home_score,
+                            'awayTeam': away_team,
+                            'awayScore': away_score,
+                            'gameId': game_id,
+                            'boxScoreUrl': f"{BASE_URL}{box_score_url}" if box_score_url else None
+                        })
                 
-                if len(cols) >= 4:
-                    date_text = cols[0].text.strip()
+                # If no score link or text says "Last 10 Games", it's upcoming
+                if is_upcoming_date and (not score_link or 'Last 10 Games' in cols[2].get_text(' ', strip=True)):
+                    # Skip games already listed
+                    key = (home_team, away_team, clean_date)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    
+                    # Try to extract round info
+                    round_text = ''
+                    round_header = row.find_previous(string=_ROUND_RE)
+                    if round_header:
+                        round_text = round_header.strip()
                     
-                    if re.match(r'[A-Za-z]{3}\.?\d{1,2}', date_text):
-                        try:
-                            home_team = cols[1].text.strip()
-                            score_link = cols[2].find('a')
-                            away_team = cols[3].text.strip()
-                            
-                            if score_link:
-                                score_text = score_link.text.strip()
-                                box_score_url = score_link.get('href', '')
-                                
-                                if '-' in score_text:
-                                    scores = score_text.strip('[]').split('-')
-                                    home_score = int(scores[0])
-                                    away_score = int(scores[1])
-                                    
-                                    game_id = parse_game_id_from_url(box_score_url)
-                                    
-                                    results.append({
-                                        'date': date_text,
-                                        'homeTeam': home_team,
-                                        'homeScore': home_score,
-                                        'awayTeam': away_team,
-                                        'awayScore': away_score,
-                                        'gameId': game_id,
-                                        'boxScoreUrl': f"{BASE_URL}{box_score_url}" if box_score_url else None
-                                    })
-                        except:
-                            continue
+                    upcoming.append({
+                        'date': clean_date,
+                        'homeTeam': home_team,
+                        'awayTeam': away_team,
+                        'homeScore': None,
+                        'awayScore': None,
+                        'time': 'TBD',
+                        'round': round_text,
+                        'venue': 'TBD'
+                    })
+        except Exception as e:
+            continue
     
-    return results[:30]
+    return results[:30], upcoming[:15]
 
-def scrape_upcoming(schedule_soup):
-    """Extract upcoming games from schedule"""
-    upcoming = []
-    
-    # Look for games without scores (upcoming)
-    games_tables = schedule_soup.find_all('table')
+def scrape_results(soup):
+    """Extract recent game results from the main page (fallback for the schedule)"""
+    results = []
     
-    for table in games_tables:
-        rows = table.find_all('tr')
+    for row in soup.select('table tr'):
+        first_col = row.find('td')
+        if not first_col:
+            continue
+        date_text = first_col.get_text().strip()
         
-        for row in rows:
-            cols = row.find_all('td')
+        if len(date_text) < 4 or not date_text[0].isalpha():
+            continue
+        if not _MAIN_DATE_RE.match(date_text):
+            continue
+        
+        cols = row.find_all('td', limit=5)
+        if len(cols) < 4:
+            continue
+        
+        texts = [col.get_text(' ', strip=True) for col in cols]
+        
+        try:
+            home_team = texts[1]
+            score_link = cols[2].find('a')
+            away_team = texts[3]
             
-            if len(cols) >= 4:
-                date_text = cols[0].text.strip()
+            if score_link:
+                score_text = score_link.get_text(' ', strip=True)
+                box_score_url = score_link.get('href', '')
                 
-                # Match date patterns
-                if re.match(r'[A-Za-z]{3}\.?\s?\d{1,2}', date_text) or 'yRM' in date_text or 'biQ' in date_text:
-                    try:
-                        # Get team names from images
-                        team1_elem = cols[1].find('img')
-                        team2_elem = cols[3].find('img') if len(cols) > 3 else None
-                        
-                        if team1_elem and team2_elem:
-                            home_team = team1_elem.get('alt', '').strip()
-                            away_team = team2_elem.get('alt', '').strip()
-                            
-                            # Check if there's a score link (means game is completed)
-                            score_link = cols[2].find('a') if len(cols) > 2 else None
-                            
-                            # If no score link or text says "Last 10 Games", it's upcoming
-                            if not score_link or 'Last 10 Games' in cols[2].text:
-                                # Clean up date
-                                clean_date = date_text.replace(':', '').replace('.', '').strip()
-                                
-                                # Try to extract round info
-                                round_text = ''
-                                round_header = row.find_previous(string=re.compile(r'Round \d+'))
-                                if round_header:
-                                    round_text = round_header.strip()
-                                
-                                upcoming.append({
-                                    'date': clean_date,
-                                    'homeTeam': home_team,
-                                    'awayTeam': away_team,
-                                    'homeScore': None,
-                                    'awayScore': None,
-                                    'time': 'TBD',
-                                    'round': round_text,
-                                    'venue': 'TBD'
-                                })
-                    except Exception as e:
-                        continue
-    
-    # Remove duplicates
-    seen = set()
-    unique_upcoming = []
-    for game in upcoming:
-        key = f"{game['homeTeam']}-{game['awayTeam']}-{game['date']}"
-        if key not in seen:
-            seen.add(key)
-            unique_upcoming.append(game)
+                match = _SCORE_RE.search(score_text)
+                if match:
+                    home_score = int(match.group(1))
+                    away_score = int(match.group(2))
+                    
+                    game_id = parse_game_id_from_url(box_score_url)
+                    
+                    results.append({
+                        'date': date_text,
+                        'homeTeam': home_team,
+                        'homeScore': home_score,
+                        'awayTeam': away_team,
+                        'awayScore': away_score,
+                        'gameId': game_id,
+                        'boxScoreUrl': f"{BASE_URL}{box_score_url}" if box_score_url else None
+                    })
+        except:
+            continue
     
-    return unique_upcoming[:15]
+    return results[:30]
 
 def scrape_stats(soup):
     """Extract stats leaders"""
@@ -320,54 +373,193 @@ def scrape_stats(soup):
         'bpg': []
     }
     
-    stat_categories = ['PPG', 'RPG', 'APG', 'SPG', 'BPG']
+    # Find the first text node mentioning each category in a single document walk
+    headers = {}
+    remaining = [category.lower() for category in STAT_CATEGORIES]
+    for node in soup.find_all(string=True):
+        text = node.lower()
+        found = [cat_lower for cat_lower in remaining if cat_lower in text]
+        if found:
+            for cat_lower in found:
+                headers[cat_lower] = node
+            remaining = [cat_lower for cat_lower in remaining if cat_lower not in headers]
+            if not remaining:
+                break
     
-    for category in stat_categories:
-        cat_lower = category.lower()
-        
-        cat_header = soup.find(string=re.compile(category, re.IGNORECASE))
-        
-        if cat_header:
-            parent = cat_header.find_parent()
-            if parent:
-                player_links = parent.find_all('a', href=re.compile(r'/player/'))
+    for cat_lower, cat_header in headers.items():
+        parent = cat_header.find_parent()
+        if parent:
+            player_links = parent.find_all('a', href=_PLAYER_HREF_RE)
+            
+            for link in player_links[:5]:
+                player_name = link.get_text(' ', strip=True)
                 
-                for link in player_links[:5]:
-                    player_name = link.text.strip()
+                row = link.find_parent('tr') or link.find_parent('div')
+                if row:
+                    text = row.get_text()
+                    numbers = _NUM_RE.findall(text)
                     
-                    row = link.find_parent('tr') or link.find_parent('div')
-                    if row:
-                        text = row.get_text()
-                        numbers = re.findall(r'\d+\.?\d*', text)
+                    if numbers:
+                        value = float(numbers[-1])
+                        
+                        team = 'Unknown'
+                        team_elem = row.find(string=_TEAM_NAME_RE)
+                        if team_elem:
+                            team = team_elem.strip()
                         
-                        if numbers:
-                            value = float(numbers[-1])
-                            
-                            team = 'Unknown'
-                            team_elem = row.find(string=re.compile(r'[A-Z][a-z]+'))
-                            if team_elem:
-                                team = team_elem.strip()
-                            
-                            stats[cat_lower].append({
-                                'player': player_name,
-                                'team': team,
-                                'value': value
-                            })
+                        stats[cat_lower].append({
+                            'player': player_name,
+                            'team': team,
+                            'value': value
+                        })
     
     return stats
 
+# Single slot, so any number of refresh requests coalesce into one pending scrape
+_refresh_requests = queue.Queue(maxsize=1)
+_refresh_in_progress = threading.Event()
+
+def request_refresh():
+    """Ask the background thread for a refresh; returns False if one is already running"""
+    if _refresh_in_progress.is_set():
+        return False
+    try:
+        _refresh_requests.put_nowait(True)
+    except queue.Full:
+        pass  # A refresh is already pending
+    return True
+
+_last_local_scrape = None
+
+def _scrape():
+    """Run one scrape in the calling thread, flagged as in progress"""
+    global _last_local_scrape
+    _refresh_in_progress.set()
+    try:
+        _last_local_scrape = time.monotonic()
+        return scrape_league_data()
+    finally:
+        _refresh_in_progress.clear()
+
+def refresh_shared_league_data(forced=False):
+    """Refresh league data, sharing one scrape per interval across workers via Redis"""
+    if _redis is None:
+        return _scrape()
+    
+    try:
+        version = _redis.get(_REDIS_VERSION_KEY)
+        version = version.decode() if version else None
+        
+        # Forced refreshes scrape right away; otherwise whoever takes the lock scrapes
+        # for this interval and the other workers pick up its snapshot on their next poll
+        if forced or _redis.set(_REDIS_LOCK_KEY, os.getpid(), nx=True, ex=REFRESH_INTERVAL):
+            success = _scrape()
+            data = league_data
+            if success and data['last_updated'] and (version is None or data['last_updated'] > version):
+                _redis.mset({
+                    _REDIS_DATA_KEY: _json_cache['bodies']['all'],
+                    _REDIS_VERSION_KEY: data['last_updated']
+                })
+            return success
+        
+        if version and version != league_data['last_updated']:
+            raw = _redis.get(_REDIS_DATA_KEY)
+            if raw:
+                publish_league_data(orjson.loads(raw))
+        return True
+        
+    except redis.RedisError as e:
+        # Poll ticks are short, so only scrape locally once per interval while Redis is down
+        if forced or _last_local_scrape is None or time.monotonic() - _last_local_scrape >= REFRESH_INTERVAL:
+            logger.warning("Redis unavailable, refreshing locally: %s", e)
+            return _scrape()
+        return False
+
 def auto_refresh():
-    """Background thread to refresh data periodically"""
+    """Background thread to refresh data periodically, or sooner when requested"""
+    wait = REDIS_POLL_INTERVAL if _redis is not None else REFRESH_INTERVAL
+    forced = False
     while True:
-        scrape_league_data()
-        time.sleep(300)  # Refresh every 5 minutes
+        try:
+            refresh_shared_league_data(forced)
+        except Exception as e:
+            # Never let a bad shared snapshot kill the refresh thread
+            logger.exception("Error refreshing shared data: %s", e)
+        
+        # Block this daemon thread (not an executor thread) so shutdown never waits on it
+        try:
+            _refresh_requests.get(timeout=wait)
+            forced = True
+        except queue.Empty:
+            forced = False
+
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+def start_background_refresh():
+    """Start the background refresh thread, at most once per process"""
+    global _refresh_thread
+    with _refresh_thread_lock:
+        if _refresh_thread is None:
+            _refresh_thread = threading.Thread(target=auto_refresh, daemon=True)
+            _refresh_thread.start()
+
+def ojsonify(obj):
+    """jsonify replacement backed by orjson"""
+    return app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+def _build_json_cache(data):
+    """Serialize and gzip every endpoint body once so requests only send bytes"""
+    last_updated = data['last_updated']
+    bodies = {'all': orjson.dumps(data)}
+    for section in ('standings', 'results', 'upcoming', 'stats_leaders'):
+        bodies[section] = orjson.dumps({
+            section: data[section],
+            'last_updated': last_updated
+        })
+    
+    return {
+        'etags': {name: hashlib.md5(body).hexdigest() for name, body in bodies.items()},
+        'bodies': bodies,
+        'gzip': {name: gzip.compress(body, compresslevel=6) for name, body in bodies.items()}
+    }
+
+def publish_league_data(data):
+    """Atomically replace the current data snapshot and its serialized bodies"""
+    global league_data, _json_cache
+    _json_cache = _build_json_cache(data)
+    league_data = data
+
+# Serialized endpoint bodies, rebuilt once per refresh and swapped in whole
+_json_cache = _build_json_cache(league_data)
+
+def _conditional_response(body, etag, encoding=None):
+    """JSON response carrying its (unquoted) ETag, or a bodyless 304 if the client has it"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=30'
+    return response
+
+def _cached_response(name):
+    """Serve a precomputed JSON body, tagged with a hash of that body"""
+    cache = _json_cache
+    etag = cache['etags'][name]
+    if request.accept_encodings['gzip'] > 0:
+        return _conditional_response(cache['gzip'][name], f'{etag}-gzip', 'gzip')
+    return _conditional_response(cache['bodies'][name], etag)
 
 # API Endpoints
 
 @app.route('/', methods=['GET'])
 def index():
     """API info"""
-    return jsonify({
+    return ojsonify({
         'name': 'Lebanese Basketball League API - Enhanced',
         'version': '2.0',
         'status': 'running',
@@ -379,13 +571,13 @@ def index():
             'Statistical leaders'
         ],
         'endpoints': {
-            '/api/data': 'Get all data',
+            '/api/data': 'Get all data (?fields=standings,results for a subset)',
             '/api/standings': 'Get standings',
             '/api/results': 'Get results with box scores',
             '/api/upcoming': 'Get upcoming games',
             '/api/stats': 'Get stats leaders',
             '/api/game/<game_id>': 'Get specific game details',
-            '/api/refresh': 'Force refresh (POST)',
+            '/api/refresh': 'Queue a background refresh (POST)',
             '/health': 'Health check'
         }
     })
@@ -393,7 +585,7 @@ def index():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return ojsonify({
         'status': 'alive',
         'timestamp': datetime.now().isoformat(),
         'last_updated': league_data.get('last_updated', 'never')
@@ -401,69 +593,70 @@ def health_check():
 
 @app.route('/api/data', methods=['GET'])
 def get_all_data():
-    """Get all league data"""
-    return jsonify(league_data)
+    """Get all league data, or only the sections listed in ?fields=standings,results"""
+    fields = request.args.get('fields')
+    if not fields:
+        return _cached_response('all')
+    
+    data = league_data
+    requested = {name.strip() for name in fields.split(',')}
+    names = sorted(name for name in requested if name in data and name != 'last_updated')
+    payload = {name: data[name] for name in names}
+    payload['last_updated'] = data['last_updated']
+    body = orjson.dumps(payload)
+    return _conditional_response(body, hashlib.md5(body).hexdigest())
 
 @app.route('/api/standings', methods=['GET'])
 def get_standings():
     """Get current standings"""
-    return jsonify({
-        'standings': league_data['standings'],
-        'last_updated': league_data['last_updated']
-    })
+    return _cached_response('standings')
 
 @app.route('/api/results', methods=['GET'])
 def get_results():
     """Get recent results with box score links"""
-    return jsonify({
-        'results': league_data['results'],
-        'last_updated': league_data['last_updated']
-    })
+    return _cached_response('results')
 
 @app.route('/api/upcoming', methods=['GET'])
 def get_upcoming():
     """Get upcoming games"""
-    return jsonify({
-        'upcoming': league_data['upcoming'],
-        'last_updated': league_data['last_updated']
-    })
+    return _cached_response('upcoming')
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get stats leaders"""
-    return jsonify({
-        'stats_leaders': league_data['stats_leaders'],
-        'last_updated': league_data['last_updated']
-    })
+    return _cached_response('stats_leaders')
 
 @app.route('/api/game/<game_id>', methods=['GET'])
 def get_game(game_id):
     """Get specific game details by ID"""
+    data = league_data
+    
     # Search in results
-    for game in league_data['results']:
+    for game in data['results']:
         if game.get('gameId') == game_id:
-            return jsonify({
+            return ojsonify({
                 'game': game,
                 'source': 'results'
             })
     
     # Search in upcoming
-    for game in league_data['upcoming']:
+    for game in data['upcoming']:
         game_key = f"{game['homeTeam']}-{game['awayTeam']}"
         if game_key == game_id:
-            return jsonify({
+            return ojsonify({
                 'game': game,
                 'source': 'upcoming'
             })
     
-    return jsonify({'error': 'Game not found'}), 404
+    return ojsonify({'error': 'Game not found'}), 404
 
 @app.route('/api/refresh', methods=['POST'])
 def force_refresh():
-    """Force a data refresh"""
-    success = scrape_league_data()
-    return jsonify({
-        'success': success,
+    """Queue a data refresh and return the current data version immediately"""
+    queued = request_refresh()
+    return ojsonify({
+        'queued': queued,
+        'in_progress': not queued,
         'last_updated': league_data['last_updated']
     })
 
@@ -478,14 +671,13 @@ if __name__ == '__main__':
     scrape_league_data()
     
     # Start background refresh thread
-    refresh_thread = threading.Thread(target=auto_refresh, daemon=True)
-    refresh_thread.start()
+    start_background_refresh()
     print("\nBackground refresh started (every 5 minutes)")
     
     # Get port from environment
     PORT = int(os.environ.get('PORT', 5000))
     
-    # Start API server
+    # Start development server (use gunicorn with gunicorn.conf.py in production)
     print(f"\nStarting API server on port {PORT}")
     print("="*60)
     app.run(host='0.0.0.0', port=PORT, debug=False)